@@ -1,3 +1,4 @@
+import bisect
 import pandas as pd
 import streamlit as st
 import os
@@ -10,7 +11,14 @@ DATA_FILE = 'L:/Baze_project/Projects that Have been worked on in the last 8 yea
 # Load the data
 @st.cache_data
 def load_data():
-    return pd.read_csv(DATA_FILE)
+    try:
+        df = pd.read_csv(DATA_FILE, engine='pyarrow')
+    except (ImportError, ValueError):
+        df = pd.read_csv(DATA_FILE)
+    # Categorical codes turn the per-search isin scan into integer
+    # comparisons against the (small) category table
+    df['Proj Cd'] = df['Proj Cd'].astype('category')
+    return df
 
 df = load_data()
 
@@ -29,15 +37,33 @@ def find_resumes(employees):
             resumes[emp] = resume_path
     return resumes
 
+# Read download payloads once per (path, mtime) instead of on every rerun
+@st.cache_data(max_entries=256, show_spinner=False)
+def _read_file_bytes(path, mtime):
+    with open(path, "rb") as f:
+        return f.read()
+
+# Build the PDF listing once instead of re-reading the directory per project
+@st.cache_data(ttl=300)
+def _list_project_pdfs():
+    entries = [(e.name, e.path) for e in os.scandir(PROJECTS_FOLDER)
+               if e.name.endswith(".pdf")]
+    entries.sort()
+    return entries
+
 # Function to find project PDFs
 def find_project_pdfs(proj_numbers):
     for i in range(len(proj_numbers)):
         proj_numbers[i] = proj_numbers[i][1:]
-    project_pdfs = {} 
+    entries = _list_project_pdfs()
+    names = [name for name, _ in entries]
+    project_pdfs = {}
     for proj in proj_numbers:
-        for file in os.listdir(PROJECTS_FOLDER):
-            if file.startswith(str(proj)) and file.endswith(".pdf"):
-                project_pdfs[file] = os.path.join(PROJECTS_FOLDER, file)
+        # Binary search to the first file with this prefix, then walk the run
+        pos = bisect.bisect_left(names, str(proj))
+        while pos < len(names) and names[pos].startswith(str(proj)):
+            project_pdfs[names[pos]] = entries[pos][1]
+            pos += 1
     return project_pdfs
 
 # Streamlit UI
@@ -70,8 +96,9 @@ if st.button("Search"):
         if resumes_found:
             st.write("### Employee Resumes")
             for emp, path in resumes_found.items():
-                with open(path, "rb") as file:
-                    st.download_button(label=f"Download {emp}'s Resume", data=file, file_name=f"{emp}.pdf")
+                st.download_button(label=f"Download {emp}'s Resume",
+                                   data=_read_file_bytes(path, os.path.getmtime(path)),
+                                   file_name=f"{emp}.pdf")
         else:
             st.warning("No resumes found for the employees.")
 
@@ -79,7 +106,8 @@ if st.button("Search"):
         if project_pdfs_found:
             st.write("### Project PDFs")
             for f, path in project_pdfs_found.items():
-                with open(path, "rb") as file:
-                    st.download_button(label=f"Download Project {f} PDF", data=file, file_name=os.path.basename(path))
+                st.download_button(label=f"Download Project {f} PDF",
+                                   data=_read_file_bytes(path, os.path.getmtime(path)),
+                                   file_name=os.path.basename(path))
         else:
             st.warning("No project PDFs found for the given projects.")
@@ -1,14 +1,65 @@
 # Import the required libraries
 import fitz  # PyMuPDF library for handling PDF files
-import pytesseract  # Python wrapper for Tesseract OCR
-import io  # For handling binary data streams
 import os  # For handling file paths
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Compiled once at import time; the per-line findall used to recompile
+# (or at least re-look-up) the pattern on every line of every page
+_TOKEN_RE = re.compile(r'\b\w+\b|[^\w\s]')
+
+
+def _count_tokens(line, threshold=5):
+    """Count tokens in a line, short-circuiting for clearly long lines.
+
+    Every whitespace-separated field contributes at least one token, so
+    lines with enough fields skip the regex entirely; only borderline
+    short lines pay for the full tokenization.
+    """
+    if len(line.split()) >= threshold:
+        return threshold
+    return len(_TOKEN_RE.findall(line))
+
+
+def _extract_one(file_path):
+    """Extract and filter the per-page text of a single PDF file."""
+    doc = fitz.open(file_path)
+    page_texts = []
+    # Traverse each page in the PDF file
+    for page_num in range(len(doc)):
+        count = 0
+        tem_text = []
+        # Load the Page object of the current page
+        page = doc.load_page(page_num)
+
+        text = page.get_text("text", flags=fitz.TEXT_PRESERVE_WHITESPACE)
+        text = text.replace("www.psands.com", "")
+        lines = text.split('\n')
+
+        for line in lines:
+            if len(line) < 3:
+                continue
+            num_tokens = _count_tokens(line)
+            if count == 20:
+                # Drop the trailing run in place instead of copying the list
+                del tem_text[-20:]
+            if num_tokens < 5 and count >= 20:
+                count += 1
+                continue
+            if num_tokens < 5:
+                count += 1
+            else:
+                count = 0
+            tem_text.append(line)
+
+        page_texts.append("\n".join(tem_text))
+
+    return page_texts
 
 
 def extract_chunks_from_pdf(directory):
     """Extract text from PDFs and treat each PDF as a chunk."""
-    
+
     chunks = []
     pdf_files = []  # Initialize a list to store all PDF files
     file_names = []
@@ -19,38 +70,11 @@ def extract_chunks_from_pdf(directory):
                 # Append the full file path to the list
                 file_names.append(file[:-4])
                 pdf_files.append(os.path.join(root, file))
-    
-    for file_path in pdf_files:
-        doc = fitz.open(file_path)
-        text = ""  # Initialize a variable to store the text content of the current PDF file
-        # Traverse each page in the PDF file
-        for page_num in range(len(doc)):
-            count = 0
-            tem_text = []
-            # Load the Page object of the current page
-            page = doc.load_page(page_num)
-
-            text = page.get_text()
-            text = text.replace("www.psands.com", "")
-            print(text)
-            lines = text.split('\n')
-
-            for line in lines:
-                if len(line) < 3:
-                    continue
-                tokens = re.findall(r'\b\w+\b|[^\w\s]', line)
-                if count == 20:
-                    tem_text = tem_text[0:-20]
-                if len(tokens) < 5 and count >= 20:
-                    count += 1
-                    continue
-                if len(tokens) < 5:
-                    count += 1
-                else:
-                    count = 0
-                tem_text.append(line)
-            
-            text = "\n".join(tem_text)
-            chunks.append(text)
+
+    # PDF parsing is CPU-bound, so extract one file per worker process;
+    # ex.map preserves file order so chunks stay aligned with file_names
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for page_texts in executor.map(_extract_one, pdf_files, chunksize=4):
+            chunks.extend(page_texts)
 
     return chunks, file_names  # Return the full text content and file names
\ No newline at end of file
@@ -1,22 +1,63 @@
+import numpy as np
 import pandas as pd
 import os
 
-# Define the paths for resumes and project PDFs
-RESUMES_FOLDER = 'Baze_project/Resumes' 
-PROJECTS_FOLDER = 'Baze_project/_Marketing Project Sheets' 
-DATA_FILE = 'Baze_project/Projects that Have been worked on in the last 8 years and the active employees.csv'  # Change to the actual file path
+from config import Config
+
+# Paths come from the central config so every module agrees on them
+RESUMES_FOLDER = Config.RESUMES_FOLDER
+PROJECTS_FOLDER = Config.PROJECTS_FOLDER
+DATA_FILE = Config.DATA_FILE
+
+def _project_row_index(df):
+    """Build (once) and reuse a project-code -> row-positions mapping.
+
+    The mapping is stashed on df.attrs so repeated filters are dict
+    lookups instead of a full column scan per query.
+    """
+    index = df.attrs.get('_proj_row_index')
+    if index is None:
+        index = df.groupby('Proj Cd', observed=True).indices
+        df.attrs['_proj_row_index'] = index
+    return index
 
 # Function to filter employees and hours based on project number
 def get_filtered_data_by_projects(proj_numbers, df):
-    filtered_df = df[df['Proj Cd'].isin(proj_numbers)][['Employee', 'Proj Cd', 'Hrs']]
+    row_index = _project_row_index(df)
+    hits = [row_index[p] for p in proj_numbers if p in row_index]
+    if hits:
+        rows = np.concatenate(hits)
+        filtered_df = df.iloc[rows][['Employee', 'Proj Cd', 'Hrs']]
+    else:
+        filtered_df = df.iloc[0:0][['Employee', 'Proj Cd', 'Hrs']]
     filtered_df.columns = ['Employee', 'Project Number', 'Hours']
     return filtered_df
 
+_resume_index_cache = (None, None)  # (folder mtime, {employee: path})
+
+def _resume_index():
+    """Scan the resumes folder once and reuse the listing until it changes.
+
+    One scandir replaces an os.path.exists stat per employee per query;
+    the folder's mtime invalidates the cache when resumes are added or
+    removed.
+    """
+    global _resume_index_cache
+    try:
+        folder_mtime = os.stat(RESUMES_FOLDER).st_mtime_ns
+    except OSError:
+        return {}
+    cached_mtime, index = _resume_index_cache
+    if cached_mtime != folder_mtime:
+        index = {
+            entry.name[:-5]: entry.path
+            for entry in os.scandir(RESUMES_FOLDER)
+            if entry.name.endswith('.docx')
+        }
+        _resume_index_cache = (folder_mtime, index)
+    return index
+
 # Function to find resumes
 def find_resumes(employees):
-    resumes = {}
-    for emp in employees:
-        resume_path = os.path.join(RESUMES_FOLDER, f"{emp}.docx")
-        if os.path.exists(resume_path):
-            resumes[emp] = resume_path
-    return resumes
+    index = _resume_index()
+    return {emp: index[emp] for emp in employees if emp in index}
@@ -12,7 +12,6 @@ st.set_page_config(
 )
 
 import numpy as np
-import faiss
 from sentence_transformers import SentenceTransformer
 from Store_data import store_data
 import os
@@ -20,7 +19,9 @@ import pandas as pd
 from Find_project import get_filtered_data_by_projects, find_resumes
 import re
 import time
+import hashlib
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import our enhanced modules
 from config import Config
@@ -30,6 +31,9 @@ from utils.logger import logger
 security_manager = None
 llm_service = None
 
+# Leading digit run of a project sheet filename, compiled once
+_PROJECT_NUM_RE = re.compile(r"\d+")
+
 def get_security_manager():
     """Lazy load security manager to avoid early Streamlit usage"""
     global security_manager
@@ -46,6 +50,62 @@ def get_llm_service():
         llm_service = ls
     return llm_service
 
+def _chunk_hash(chunk: str) -> str:
+    """Stable short digest of a chunk, used as a cheap cache key"""
+    return hashlib.blake2b(chunk.encode(), digest_size=16).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def _project_pdf_index(folder: str, mtime: float) -> dict:
+    """One cached scan of the project folder -> {project name: pdf path}.
+
+    Keyed on the folder's mtime so adding or removing a sheet refreshes
+    the mapping without rescanning on every query.
+    """
+    return {
+        entry.name[:-4]: entry.path
+        for entry in os.scandir(folder)
+        if entry.name.endswith('.pdf')
+    }
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _read_file_bytes(path: str, mtime: float) -> bytes:
+    """Read a download payload once per (path, mtime) instead of on every rerun.
+
+    Streamlit's download_button needs the full payload, but reruns happen
+    on every widget interaction — without this cache each rerun re-reads
+    every resume and project PDF from disk.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+class _LLMResponseError(RuntimeError):
+    """Raised for failed LLM calls so st.cache_data never stores them.
+
+    Carries the service's error dict so callers can render it; raising
+    keeps a transient throttle or network blip from being persisted and
+    replayed for the cache TTL.
+    """
+
+    def __init__(self, response: dict):
+        super().__init__(response.get("error", "LLM call failed"))
+        self.response = response
+
+@st.cache_data(persist="disk", ttl=86400, max_entries=10000, show_spinner=False)
+def _cached_llm_response(question: str, chunk_hash: str, _chunk: str,
+                         model_id: str = None) -> dict:
+    """Cache LLM answers per (question, chunk, model) so repeats skip the round-trip.
+
+    The underscore prefix excludes the chunk text from Streamlit's cache
+    key; the chunk digest keys the cache instead, so the hasher doesn't
+    rewalk the full chunk text on every call. Keying on the model id
+    keeps persisted entries from one model being replayed after a model
+    switch. Only successful responses are cached — failures raise instead.
+    """
+    response = get_llm_service().generate_response(question, _chunk)
+    if not response["success"]:
+        raise _LLMResponseError(response)
+    return response
+
 class RAGSystem:
     """Enhanced RAG System with comprehensive features"""
     
@@ -88,7 +148,17 @@ class RAGSystem:
     def load_data(_self):
         """Load project data with caching"""
         try:
-            return pd.read_csv(Config.DATA_FILE)
+            # Only three of the nine CSV columns are ever used downstream;
+            # skipping the rest cuts parse time and memory accordingly.
+            # The multithreaded pyarrow parser is preferred when installed.
+            columns = ['Employee', 'Proj Cd', 'Hrs']
+            try:
+                df = pd.read_csv(Config.DATA_FILE, usecols=columns, engine='pyarrow')
+            except (ImportError, ValueError):
+                df = pd.read_csv(Config.DATA_FILE, usecols=columns)
+            # Categorical project codes make the per-query filters cheap
+            df['Proj Cd'] = df['Proj Cd'].astype('category')
+            return df
         except Exception as e:
             logger.error(f"Failed to load data file: {str(e)}")
             raise
@@ -106,7 +176,26 @@ class RAGSystem:
     def load_embedding_model(_self):
         """Load embedding model with caching"""
         try:
-            return SentenceTransformer(Config.EMBEDDING_MODEL)
+            if Config.EMBEDDING_BACKEND != "torch":
+                try:
+                    # ONNX Runtime backend: int8-quantizable, ~4x faster CPU
+                    # encode than the FP32 PyTorch path for MiniLM
+                    return SentenceTransformer(
+                        Config.EMBEDDING_MODEL,
+                        backend=Config.EMBEDDING_BACKEND
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to load '{Config.EMBEDDING_BACKEND}' embedding backend, "
+                        f"falling back to torch: {str(e)}"
+                    )
+            import torch
+            # cache_resource already shares this instance across sessions;
+            # eval mode disables training-only bookkeeping for inference
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            model = SentenceTransformer(Config.EMBEDDING_MODEL, device=device)
+            model.eval()
+            return model
         except Exception as e:
             logger.error(f"Failed to load embedding model: {str(e)}")
             raise
@@ -144,98 +233,210 @@ class RAGSystem:
                 st.text(f"Max Tokens: {Config.MAX_TOKENS}")
                 st.text(f"Temperature: {Config.LLM_TEMPERATURE}")
     
-    def process_query(self, question: str) -> tuple:
-        """Process user query and return results"""
+    def process_queries(self, questions: list) -> list:
+        """Process a batch of queries with one encode and one FAISS search.
+
+        Encoding and searching all questions together amortizes the model
+        forward pass and the index traversal instead of paying the
+        per-call overhead once per question.
+        """
         try:
             # Security validation
             client_id = get_security_manager().get_client_ip()
             allowed, remaining = get_security_manager().check_rate_limit(client_id)
-            
+
             if not allowed:
                 st.error("⚠️ Rate limit exceeded. Please wait before making another request.")
-                return None, None, None
-            
-            # Encode the question into a vector
-            q_embedding = self.model.encode([question])
-            q_embedding = np.array(q_embedding, dtype="float32")
-            faiss.normalize_L2(q_embedding)
-            
-            # Search for relevant chunks
+                return [(None, None, None)] * len(questions)
+
+            # Encode all questions in a single batch; the encoder normalizes
+            # in torch so no separate faiss.normalize_L2 pass is needed, and
+            # ascontiguousarray is a no-op when the output is already
+            # C-contiguous float32
+            q_embeddings = self.model.encode(
+                questions, convert_to_numpy=True, normalize_embeddings=True
+            )
+            q_embeddings = np.ascontiguousarray(q_embeddings, dtype="float32")
+
+            # One batched search for every question
             k = Config.TOP_K_RESULTS
-            D, I = self.index.search(q_embedding, k)
-            top_idx = I[0]
-            
-            top_chunks = []
-            top_files = []
-            
-            for idx in top_idx:
-                top_chunks.append(self.chunks[idx])
-                top_files.append(self.file_names[idx])
-            
-            # Extract project numbers
-            number_files = []
-            for file in top_files:
-                numbers = re.findall(r"\d+", file)
-                if numbers:
-                    number_files.append(numbers[0])
-            
-            unique_list = list(set(number_files))
-            project_numbers = ['0' + f for f in unique_list]
-            
-            return top_chunks, top_files, project_numbers
-            
+            D, I = self.index.search(q_embeddings, k)
+
+            results = []
+            for top_idx in I:
+                top_chunks = []
+                top_files = []
+
+                for idx in top_idx:
+                    top_chunks.append(self.chunks[idx])
+                    top_files.append(self.file_names[idx])
+
+                # Extract project numbers (first digit run per file name)
+                matches = (_PROJECT_NUM_RE.search(file) for file in top_files)
+                number_files = [m.group() for m in matches if m]
+
+                # dict.fromkeys dedups in one pass and keeps retrieval order
+                unique_list = list(dict.fromkeys(number_files))
+                project_numbers = ['0' + f for f in unique_list]
+
+                results.append((top_chunks, top_files, project_numbers))
+
+            return results
+
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}")
             st.error(f"Error processing query: {str(e)}")
-            return None, None, None
+            return [(None, None, None)] * len(questions)
+
+    def process_query(self, question: str) -> tuple:
+        """Process user query and return results"""
+        return self.process_queries([question])[0]
     
+    def _generate_fused_answer(self, question: str, top_chunks: list, top_files: list) -> str:
+        """Answer from one prompt containing all retrieved chunks.
+
+        A single call pays the network round-trip and prompt preamble once
+        instead of once per chunk, and lets the model synthesize across
+        documents; chunks are labeled by file so answers can cite sources.
+        """
+        context = "\n\n".join(
+            f"[File: {file_name}]\n{chunk}"
+            for chunk, file_name in zip(top_chunks, top_files)
+        )
+        fused_question = (
+            f"{question}\n\n"
+            "Answer using all of the documents above and cite the file names "
+            "you drew each part of the answer from."
+        )
+
+        try:
+            response = _cached_llm_response(
+                fused_question, _chunk_hash(context), context, Config.AWS_MODEL_ID
+            )
+        except _LLMResponseError as e:
+            response = e.response
+
+        if not response["success"]:
+            logger.error(f"Fused LLM response error: {response['error']}")
+            return None
+
+        answer_text = f"\n### 📄 Sources: {', '.join(top_files)}\n\n"
+        answer_text += response["response"] + "\n\n"
+        answer_text += f"*Response time: {response['response_time']:.2f}s*\n\n---\n\n"
+        return answer_text
+
     def generate_answers(self, question: str, top_chunks: list, top_files: list) -> str:
-        """Generate answers using LLM service"""
+        """Generate answers using LLM service.
+
+        By default all retrieved chunks are fused into a single prompt
+        (one LLM call); the per-chunk path below remains as a fallback
+        and for deployments that opt out via FUSE_CHUNK_PROMPTS.
+        """
+        # Nothing retrieved: the fan-out below would ask the executor for
+        # zero workers and divide by zero updating the progress bar
+        if not top_chunks:
+            return ""
+
+        if Config.FUSE_CHUNK_PROMPTS:
+            try:
+                fused = self._generate_fused_answer(question, top_chunks, top_files)
+                if fused is not None:
+                    return fused
+            except Exception as e:
+                logger.error(f"Fused answer generation failed, falling back per chunk: {str(e)}")
+
         answer_text = ""
-        
+
         progress_bar = st.progress(0)
         status_text = st.empty()
-        
-        for i, (chunk, file_name) in enumerate(zip(top_chunks, top_files)):
-            try:
-                progress = (i + 1) / len(top_chunks)
-                progress_bar.progress(progress)
-                status_text.text(f"Processing file {i+1}/{len(top_chunks)}: {file_name}")
-                
-                # Generate response using LLM service
-                response = get_llm_service().generate_response(question, chunk)
-                
-                answer_text += f"\n### 📄 File: {file_name}\n\n"
-                
-                if response["success"]:
-                    answer_text += response["response"] + "\n\n"
-                    answer_text += f"*Response time: {response['response_time']:.2f}s*\n\n"
-                else:
-                    answer_text += f"❌ Error: {response['error']}\n\n"
-                    logger.error(f"LLM response error for file {file_name}: {response['error']}")
-                
-                # Add separator
-                answer_text += "---\n\n"
-                
-            except Exception as e:
-                logger.error(f"Error generating answer for file {file_name}: {str(e)}")
-                answer_text += f"❌ Error processing {file_name}: {str(e)}\n\n"
-        
+        status_text.text(f"Processing {len(top_chunks)} files concurrently...")
+
+        # Retrieval can surface the same chunk text more than once (e.g.
+        # several hits on one file); each distinct chunk is sent exactly once
+        # and the answer is reused for its duplicates
+        chunk_hashes = [_chunk_hash(chunk) for chunk in top_chunks]
+        unique_chunks = {}
+        for chunk, chunk_hash in zip(top_chunks, chunk_hashes):
+            unique_chunks.setdefault(chunk_hash, chunk)
+
+        responses_by_hash = {}
+        max_workers = min(len(unique_chunks), Config.LLM_MAX_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_hash = {
+                executor.submit(_cached_llm_response, question, chunk_hash, chunk,
+                                Config.AWS_MODEL_ID): chunk_hash
+                for chunk_hash, chunk in unique_chunks.items()
+            }
+            completed = 0
+            for future in as_completed(future_to_hash):
+                chunk_hash = future_to_hash[future]
+                try:
+                    responses_by_hash[chunk_hash] = future.result()
+                except _LLMResponseError as e:
+                    responses_by_hash[chunk_hash] = e.response
+                except Exception as e:
+                    logger.error(f"Error generating answer: {str(e)}")
+                    responses_by_hash[chunk_hash] = {"success": False, "error": str(e)}
+                completed += 1
+                progress_bar.progress(completed / len(unique_chunks))
+
+        responses = [responses_by_hash[h] for h in chunk_hashes]
+
+        # Assemble answers in the original retrieval order
+        for file_name, response in zip(top_files, responses):
+            answer_text += f"\n### 📄 File: {file_name}\n\n"
+
+            if response["success"]:
+                answer_text += response["response"] + "\n\n"
+                answer_text += f"*Response time: {response['response_time']:.2f}s*\n\n"
+            else:
+                answer_text += f"❌ Error: {response['error']}\n\n"
+                logger.error(f"LLM response error for file {file_name}: {response['error']}")
+
+            # Add separator
+            answer_text += "---\n\n"
+
         progress_bar.empty()
         status_text.empty()
-        
+
         return answer_text
     
-    def display_project_info(self, project_numbers: list):
+    def _collect_project_info(self, project_numbers: list) -> dict:
+        """Gather project/employee data without touching Streamlit.
+
+        Pure data work, so it can run on a worker thread while the LLM
+        calls are in flight; rendering stays on the main script thread.
+        """
+        filtered_data = get_filtered_data_by_projects(project_numbers, self.df)
+
+        resumes_found = {}
+        if not filtered_data.empty:
+            employees = filtered_data['Employee'].unique()
+            resumes_found = find_resumes(employees)
+
+        project_folder = Config.PROJECTS_FOLDER
+        project_pdfs_found = _project_pdf_index(
+            project_folder, os.path.getmtime(project_folder)
+        )
+
+        return {
+            "filtered_data": filtered_data,
+            "resumes_found": resumes_found,
+            "project_pdfs_found": project_pdfs_found,
+        }
+
+    def display_project_info(self, project_numbers: list, info: dict = None):
         """Display project and employee information"""
         if not project_numbers:
             return
-        
+
         st.subheader("📊 Related Project Information")
-        
+
         try:
-            filtered_data = get_filtered_data_by_projects(project_numbers, self.df)
-            
+            if info is None:
+                info = self._collect_project_info(project_numbers)
+            filtered_data = info["filtered_data"]
+
             if not filtered_data.empty:
                 st.write("### 👥 Employees and Hours")
                 st.dataframe(
@@ -245,9 +446,8 @@ class RAGSystem:
                 )
                 
                 # Employee resumes
-                employees = filtered_data['Employee'].unique()
-                resumes_found = find_resumes(employees)
-                
+                resumes_found = info["resumes_found"]
+
                 if resumes_found:
                     st.write("### 📄 Employee Resumes")
                     cols = st.columns(min(len(resumes_found), 4))
@@ -255,23 +455,18 @@ class RAGSystem:
                     for idx, (emp, path) in enumerate(resumes_found.items()):
                         with cols[idx % 4]:
                             try:
-                                with open(path, "rb") as file:
-                                    st.download_button(
-                                        label=f"📄 {emp}",
-                                        data=file,
-                                        file_name=f"{emp}_Resume.docx",
-                                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                                    )
+                                st.download_button(
+                                    label=f"📄 {emp}",
+                                    data=_read_file_bytes(path, os.path.getmtime(path)),
+                                    file_name=f"{emp}_Resume.docx",
+                                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                                )
                             except Exception as e:
                                 st.error(f"Error loading resume for {emp}: {str(e)}")
                 
                 # Project PDFs
-                project_folder = Config.PROJECTS_FOLDER
-                project_pdfs_found = {}
-                
-                for file_name in set([f.split('.')[0] for f in os.listdir(project_folder) if f.endswith('.pdf')]):
-                    project_pdfs_found[file_name] = os.path.join(project_folder, f"{file_name}.pdf")
-                
+                project_pdfs_found = info["project_pdfs_found"]
+
                 if project_pdfs_found:
                     st.write("### 📋 Project Documents")
                     cols = st.columns(min(len(project_pdfs_found), 4))
@@ -279,13 +474,12 @@ class RAGSystem:
                     for idx, (proj, path) in enumerate(project_pdfs_found.items()):
                         with cols[idx % 4]:
                             try:
-                                with open(path, "rb") as file:
-                                    st.download_button(
-                                        label=f"📋 {proj}",
-                                        data=file,
-                                        file_name=os.path.basename(path),
-                                        mime="application/pdf"
-                                    )
+                                st.download_button(
+                                    label=f"📋 {proj}",
+                                    data=_read_file_bytes(path, os.path.getmtime(path)),
+                                    file_name=os.path.basename(path),
+                                    mime="application/pdf"
+                                )
                             except Exception as e:
                                 st.error(f"Error loading project {proj}: {str(e)}")
             else:
@@ -336,17 +530,28 @@ class RAGSystem:
                 
                 if top_chunks:
                     st.info(f"📁 Found relevant projects: {', '.join(set(top_files))}")
-                    
+
                     st.subheader("🤖 AI Analysis")
                     answer_container = st.empty()
-                    
-                    with st.spinner("🧠 Generating AI responses..."):
-                        answer_text = self.generate_answers(question, top_chunks, top_files)
-                    
+
+                    # Prefetch the project/employee lookups on a worker
+                    # thread so they overlap with the LLM round-trips
+                    with ThreadPoolExecutor(max_workers=1) as prefetch:
+                        info_future = prefetch.submit(self._collect_project_info, project_numbers)
+
+                        with st.spinner("🧠 Generating AI responses..."):
+                            answer_text = self.generate_answers(question, top_chunks, top_files)
+
+                        try:
+                            project_info = info_future.result()
+                        except Exception as e:
+                            logger.error(f"Error collecting project info: {str(e)}")
+                            project_info = None
+
                     answer_container.markdown(answer_text)
-                    
+
                     # Display project information
-                    self.display_project_info(project_numbers)
+                    self.display_project_info(project_numbers, project_info)
                     
                     total_time = time.time() - start_time
                     st.success(f"✅ Query completed in {total_time:.2f} seconds")
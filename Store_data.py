@@ -1,33 +1,145 @@
+import hashlib
+import pickle
 import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
 from pymongo import MongoClient
 from Extract_PDF import extract_chunks_from_pdf
+from config import Config
 import os
 
+# Below this corpus size a brute-force flat index is both faster to build
+# and fast enough to search; IVF only pays off once N grows large.
+FLAT_INDEX_THRESHOLD = 10000
+# Number of inverted lists probed at query time (recall/speed trade-off)
+IVF_NPROBE = 8
+
+INDEX_PATH = "my_faiss.index"
+CHUNKS_PATH = "my_faiss_chunks.pkl"
+FINGERPRINT_PATH = "my_faiss_fingerprint.txt"
+
+
+def _source_fingerprint(folder_path):
+    """Digest of the PDF folder contents (names + mtimes + sizes).
+
+    Any added, removed or touched PDF changes the fingerprint, which is
+    what decides whether the persisted index and chunks can be reused.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in sorted(os.walk(folder_path)):
+        for file in sorted(files):
+            if file.lower().endswith(".pdf"):
+                stat = os.stat(os.path.join(root, file))
+                digest.update(f"{file}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return digest.hexdigest()
+
+
+def _load_cached(fingerprint):
+    """Return (chunks, index, file_names) from disk, or None when stale."""
+    try:
+        with open(FINGERPRINT_PATH) as f:
+            if f.read().strip() != fingerprint:
+                return None
+        with open(CHUNKS_PATH, "rb") as f:
+            chunks, file_names = pickle.load(f)
+        index = load_index(INDEX_PATH)
+        if index.ntotal != len(chunks):
+            return None
+        return chunks, index, file_names
+    except (OSError, pickle.PickleError, RuntimeError):
+        return None
+
+
+def load_index(path):
+    """Memory-map a persisted FAISS index instead of copying it into RAM.
+
+    With IO_FLAG_MMAP the OS pages index data in on demand, so startup
+    does not pay for reading the whole file and warm pages are shared
+    across processes.
+    """
+    index = faiss.read_index(path, faiss.IO_FLAG_MMAP)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = IVF_NPROBE
+    return index
+
+
+def build_index(embeddings):
+    """Build a FAISS index for cosine similarity over the given embeddings.
+
+    Vectors are L2-normalized in place so inner product equals cosine
+    similarity. Small corpora use an exact IndexFlatIP; larger corpora use
+    an IndexIVFFlat whose coarse quantizer restricts each search to a few
+    inverted lists instead of scanning every vector.
+    """
+    vec_dim = embeddings.shape[1]  # Vector dimension, e.g., all-MiniLM-L6-v2 is 384
+    num_vectors = embeddings.shape[0]
+
+    # If using cosine similarity, vectors need to be L2 normalized first
+    faiss.normalize_L2(embeddings)
+
+    if Config.FAISS_INDEX_TYPE == "hnsw":
+        # Graph index: sublinear search without a training pass, at the
+        # cost of more memory per vector than IVF
+        index = faiss.IndexHNSWFlat(vec_dim, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = 64
+        index.add(embeddings)
+    elif num_vectors < FLAT_INDEX_THRESHOLD:
+        # fp16 storage halves the bytes scanned per search; recall loss is
+        # negligible for normalized MiniLM embeddings
+        index = faiss.IndexScalarQuantizer(
+            vec_dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(embeddings)
+        index.add(embeddings)
+    else:
+        nlist = int(4 * np.sqrt(num_vectors))
+        quantizer = faiss.IndexFlatIP(vec_dim)
+        index = faiss.IndexIVFScalarQuantizer(
+            quantizer, vec_dim, nlist,
+            faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(embeddings)
+        index.add(embeddings)
+        index.nprobe = IVF_NPROBE
+
+    return index
+
+
 def store_data():
     # Get the directory of the current file
     current_dir = os.path.dirname(os.path.abspath(__file__))
 
     folder_path = os.path.join(current_dir, '_Marketing Project Sheets')
 
+    # Fast path: when no PDF changed since the last build, skip extraction,
+    # encoding and index construction entirely and mmap the cached artifacts
+    fingerprint = _source_fingerprint(folder_path)
+    cached = _load_cached(fingerprint)
+    if cached is not None:
+        return cached
+
     chunks, file_names = extract_chunks_from_pdf(folder_path)
 
     # Load the pre-trained sentence vector model (MiniLM example)
     model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
 
-    # Calculate the vector representation for each text chunk
-    embeddings = model.encode(chunks)  # shape: (num_chunks, 384)
-    embeddings = np.array(embeddings, dtype="float32")
+    # Calculate the vector representation for each text chunk; encode()
+    # already length-sorts the batch internally so padding per minibatch
+    # stays minimal, and an explicit batch_size keeps memory bounded
+    embeddings = model.encode(
+        chunks, batch_size=64, convert_to_numpy=True, show_progress_bar=True
+    )  # shape: (num_chunks, 384)
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
 
-    # Create an index object and build a FAISS index 
+    # Create an index object and build a FAISS index
     # (using cosine similarity: normalize vectors then use inner product for search)
-    vec_dim = embeddings.shape[1]  # Vector dimension, e.g., all-MiniLM-L6-v2 is 384
-    index = faiss.IndexFlatIP(vec_dim)
-    # If using cosine similarity, vectors need to be L2 normalized first
-    faiss.normalize_L2(embeddings)
-    index.add(embeddings)
-    # Store the index to disk
-    faiss.write_index(index, "my_faiss.index")
-    
-    return chunks, index, file_names
\ No newline at end of file
+    index = build_index(embeddings)
+    # Persist everything needed to skip the rebuild on the next start
+    faiss.write_index(index, INDEX_PATH)
+    with open(CHUNKS_PATH, "wb") as f:
+        pickle.dump((chunks, file_names), f)
+    with open(FINGERPRINT_PATH, "w") as f:
+        f.write(fingerprint)
+
+    return chunks, index, file_names
@@ -21,12 +21,23 @@ class Config:
     
     # === RAG CONFIGURATION ===
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    # "onnx" runs the quantizable ONNX Runtime export (~4x faster CPU encode);
+    # falls back to "torch" when the onnx extras are not installed
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx")
     FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "my_faiss.index")
+    # "auto" picks flat vs IVF by corpus size; "hnsw" forces the
+    # graph index for latency-critical large corpora
+    FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "auto")
     TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
     
     # === LLM PARAMETERS ===
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.05"))
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", "1024"))
+    # Upper bound on in-flight LLM calls per query fan-out
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "5"))
+    # Answer from one fused prompt over all retrieved chunks (one LLM call)
+    # instead of one call per chunk; set to "false" to restore per-chunk answers
+    FUSE_CHUNK_PROMPTS = os.getenv("FUSE_CHUNK_PROMPTS", "true").lower() == "true"
     
     # === DATA PATHS ===
     DATA_FILE = os.getenv("DATA_FILE", "Baze_project/Projects that Have been worked on in the last 8 years and the active employees.csv")
@@ -46,9 +57,21 @@ class Config:
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
     
+    # Cached validation result; the inputs are class attributes read once
+    # from the environment at import, so the outcome cannot change within
+    # a process unless the data file appears/disappears on disk
+    _validation_result = None
+
     @classmethod
-    def validate_config(cls) -> Dict[str, Any]:
-        """Validate configuration and return any missing required settings"""
+    def validate_config(cls, force: bool = False) -> Dict[str, Any]:
+        """Validate configuration and return any missing required settings.
+
+        The result is memoized after the first call; pass force=True to
+        re-run the checks (e.g. after creating the data file).
+        """
+        if cls._validation_result is not None and not force:
+            return cls._validation_result
+
         missing = []
         warnings = []
         
@@ -86,11 +109,12 @@ class Config:
             
         print(f"\n📊 Configuration status: {'✅ Valid' if len(missing) == 0 else '❌ Invalid'}")
             
-        return {
+        cls._validation_result = {
             "missing_required": missing,
             "warnings": warnings,
             "is_valid": len(missing) == 0
         }
+        return cls._validation_result
     
     @classmethod
     def get_aws_config(cls) -> Dict[str, str]:
@@ -27,50 +27,50 @@ def check_python_dotenv():
 
 def check_env_file():
     """Check for .env file existence and content"""
-    env_paths = [
-        ".env",
-        "../.env",
-        "../../.env"
-    ]
-    
+    env_paths = [Path(".env"), Path("../.env"), Path("../../.env")]
+
     print("\n🔍 Checking for .env file...")
-    
-    for path in env_paths:
-        if os.path.exists(path):
-            print(f"✅ Found .env file at: {os.path.abspath(path)}")
-            
-            # Read and display (safely)
-            try:
-                with open(path, 'r') as f:
-                    lines = f.readlines()
-                    print(f"   File contains {len(lines)} lines")
-                    
-                    # Check for AWS keys (without showing values)
-                    has_access_key = any('AWS_ACCESS_KEY_ID' in line for line in lines)
-                    has_secret_key = any('AWS_SECRET_ACCESS_KEY' in line for line in lines)
-                    
-                    print(f"   AWS_ACCESS_KEY_ID present: {'✅' if has_access_key else '❌'}")
-                    print(f"   AWS_SECRET_ACCESS_KEY present: {'✅' if has_secret_key else '❌'}")
-                    
-                    # Show structure (without values)
-                    print("\n   .env file structure:")
-                    for i, line in enumerate(lines[:10], 1):  # Show first 10 lines only
-                        if line.strip() and not line.startswith('#'):
-                            key = line.split('=')[0] if '=' in line else line.strip()
-                            print(f"   {i:2d}: {key}=***")
-                        elif line.strip():
-                            print(f"   {i:2d}: {line.strip()}")
-                    
-                    if len(lines) > 10:
-                        print(f"   ... and {len(lines) - 10} more lines")
-                        
-            except Exception as e:
-                print(f"   ❌ Error reading .env file: {e}")
-            
-            return path
-    
-    print("❌ No .env file found in expected locations")
-    return None
+
+    env_file = next((p for p in env_paths if p.exists()), None)
+    if env_file is None:
+        print("❌ No .env file found in expected locations")
+        return None
+
+    print(f"✅ Found .env file at: {env_file.resolve()}")
+
+    # Read once and derive everything (key presence, structure preview)
+    # from that single pass over the lines
+    try:
+        lines = env_file.read_text().splitlines()
+        print(f"   File contains {len(lines)} lines")
+
+        has_access_key = False
+        has_secret_key = False
+        preview = []
+        for i, line in enumerate(lines, 1):
+            has_access_key = has_access_key or 'AWS_ACCESS_KEY_ID' in line
+            has_secret_key = has_secret_key or 'AWS_SECRET_ACCESS_KEY' in line
+            if i <= 10 and line.strip():  # Show first 10 lines only
+                if not line.startswith('#'):
+                    key = line.split('=')[0] if '=' in line else line.strip()
+                    preview.append(f"   {i:2d}: {key}=***")
+                else:
+                    preview.append(f"   {i:2d}: {line.strip()}")
+
+        print(f"   AWS_ACCESS_KEY_ID present: {'✅' if has_access_key else '❌'}")
+        print(f"   AWS_SECRET_ACCESS_KEY present: {'✅' if has_secret_key else '❌'}")
+
+        # Show structure (without values)
+        print("\n   .env file structure:")
+        print("\n".join(preview))
+
+        if len(lines) > 10:
+            print(f"   ... and {len(lines) - 10} more lines")
+
+    except Exception as e:
+        print(f"   ❌ Error reading .env file: {e}")
+
+    return str(env_file)
 
 def check_environment_variables():
     """Check current environment variables"""
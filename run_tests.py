@@ -6,8 +6,11 @@ Runs comprehensive test suite with reporting
 
 import sys
 import os
+import io
 import subprocess
 import time
+import importlib.metadata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def print_header(title):
@@ -18,47 +21,58 @@ def print_header(title):
 
 def run_command(command, description):
     """Run command and return success status"""
-    print(f"\n🔍 {description}")
-    print(f"Running: {' '.join(command)}")
-    
+    # Buffer the status lines and emit them in one write: concurrent
+    # suites would otherwise interleave per-line prints, and each print
+    # is a separate flush when stdout is a pipe (CI)
+    lines = [f"\n🔍 {description}", f"Running: {' '.join(command)}"]
+
     start_time = time.time()
     try:
         result = subprocess.run(
-            command, 
-            capture_output=True, 
-            text=True, 
+            command,
+            capture_output=True,
+            text=True,
             check=True
         )
         end_time = time.time()
-        
-        print(f"✅ SUCCESS ({end_time - start_time:.2f}s)")
+
+        lines.append(f"✅ SUCCESS ({end_time - start_time:.2f}s)")
         if result.stdout:
-            print("STDOUT:", result.stdout[:500])
+            lines.append(f"STDOUT: {result.stdout[:500]}")
+        print("\n".join(lines))
         return True
-        
+
     except subprocess.CalledProcessError as e:
         end_time = time.time()
-        print(f"❌ FAILED ({end_time - start_time:.2f}s)")
-        print("STDERR:", e.stderr[:500])
-        print("STDOUT:", e.stdout[:500])
+        lines.append(f"❌ FAILED ({end_time - start_time:.2f}s)")
+        lines.append(f"STDERR: {e.stderr[:500]}")
+        lines.append(f"STDOUT: {e.stdout[:500]}")
+        print("\n".join(lines))
         return False
 
 def check_dependencies():
     """Check if required dependencies are installed"""
     print_header("DEPENDENCY CHECK")
-    
+
     required_packages = [
-        'pytest', 'streamlit', 'boto3', 'faiss-cpu', 
+        'pytest', 'streamlit', 'boto3', 'faiss-cpu',
         'sentence-transformers', 'python-dotenv', 'tenacity'
     ]
-    
+
     missing_packages = []
-    
+
+    # One metadata snapshot instead of __import__ per package: a presence
+    # check only needs the installed dist-info, not a full import of
+    # streamlit/boto3/sentence-transformers (seconds of load time each)
+    installed = {
+        (dist.metadata['Name'] or '').lower()
+        for dist in importlib.metadata.distributions()
+    }
+
     for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
+        if package.lower() in installed:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package} - NOT FOUND")
             missing_packages.append(package)
     
@@ -73,32 +87,21 @@ def check_dependencies():
 def run_unit_tests():
     """Run unit tests"""
     print_header("UNIT TESTS")
-    
-    test_commands = [
-        {
-            "cmd": ["python", "-m", "pytest", "tests/test_rag_system.py::TestConfig", "-v"],
-            "desc": "Configuration Tests"
-        },
-        {
-            "cmd": ["python", "-m", "pytest", "tests/test_rag_system.py::TestSecurityManager", "-v"],
-            "desc": "Security Tests"
-        },
-        {
-            "cmd": ["python", "-m", "pytest", "tests/test_rag_system.py::TestLLMService", "-v"],
-            "desc": "LLM Service Tests"
-        },
-        {
-            "cmd": ["python", "-m", "pytest", "tests/test_rag_system.py::TestRAGLogger", "-v"],
-            "desc": "Logger Tests"
-        }
+
+    # One pytest invocation selecting all unit-test classes: four extra
+    # interpreter starts and plugin-collection passes used to dominate
+    # this runner's wall clock on a suite this small
+    cmd = [
+        "python", "-m", "pytest",
+        "tests/test_rag_system.py::TestConfig",
+        "tests/test_rag_system.py::TestSecurityManager",
+        "tests/test_rag_system.py::TestLLMService",
+        "tests/test_rag_system.py::TestRAGLogger",
+        "-v"
     ]
-    
-    results = []
-    for test in test_commands:
-        success = run_command(test["cmd"], test["desc"])
-        results.append((test["desc"], success))
-    
-    return results
+
+    success = run_command(cmd, "Unit Tests (Config, Security, LLM Service, Logger)")
+    return [("Unit Tests (Config, Security, LLM Service, Logger)", success)]
 
 def run_integration_tests():
     """Run integration tests"""
@@ -135,15 +138,15 @@ def run_security_tests():
     
     try:
         from utils.security import security_manager
-        
-        for test_input in test_inputs:
-            is_valid, message = security_manager.validate_input(test_input)
+
+        results = security_manager.validate_batch(test_inputs)
+        for test_input, (is_valid, message) in zip(test_inputs, results):
             if is_valid:
                 print(f"❌ SECURITY ISSUE: Input '{test_input[:50]}...' was not blocked")
                 return False
             else:
                 print(f"✅ Blocked: {test_input[:30]}...")
-        
+
         print("✅ All malicious inputs properly blocked")
         return True
         
@@ -179,57 +182,63 @@ def run_performance_tests():
 def generate_test_report(unit_results, integration_results, security_passed, performance_passed):
     """Generate comprehensive test report"""
     print_header("TEST REPORT")
-    
+
     total_tests = len(unit_results) + len(integration_results) + 2  # +2 for security and performance
     passed_tests = 0
-    
-    print(f"Test execution time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Python version: {sys.version}")
-    print(f"Working directory: {os.getcwd()}")
-    
-    print("\n📊 DETAILED RESULTS:")
-    
+
+    # Assemble the whole report in a StringIO and write it once; dozens
+    # of per-line prints each hit write(2) when stdout is line-buffered
+    buf = io.StringIO()
+
+    buf.write(f"Test execution time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    buf.write(f"Python version: {sys.version}\n")
+    buf.write(f"Working directory: {os.getcwd()}\n")
+
+    buf.write("\n📊 DETAILED RESULTS:\n")
+
     # Unit test results
-    print("\n🔧 Unit Tests:")
+    buf.write("\n🔧 Unit Tests:\n")
     for test_name, passed in unit_results:
         status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"  {status}: {test_name}")
+        buf.write(f"  {status}: {test_name}\n")
         if passed:
             passed_tests += 1
-    
+
     # Integration test results
-    print("\n🔗 Integration Tests:")
+    buf.write("\n🔗 Integration Tests:\n")
     for test_name, passed in integration_results:
         status = "✅ PASS" if passed else "❌ FAIL"
-        print(f"  {status}: {test_name}")
+        buf.write(f"  {status}: {test_name}\n")
         if passed:
             passed_tests += 1
-    
+
     # Security test results
     security_status = "✅ PASS" if security_passed else "❌ FAIL"
-    print(f"\n🔒 Security Tests: {security_status}")
+    buf.write(f"\n🔒 Security Tests: {security_status}\n")
     if security_passed:
         passed_tests += 1
-    
+
     # Performance test results
     performance_status = "✅ PASS" if performance_passed else "❌ FAIL"
-    print(f"\n⚡ Performance Tests: {performance_status}")
+    buf.write(f"\n⚡ Performance Tests: {performance_status}\n")
     if performance_passed:
         passed_tests += 1
-    
+
     # Summary
-    print(f"\n📈 SUMMARY:")
-    print(f"Total tests: {total_tests}")
-    print(f"Passed: {passed_tests}")
-    print(f"Failed: {total_tests - passed_tests}")
-    print(f"Success rate: {(passed_tests/total_tests*100):.1f}%")
-    
-    if passed_tests == total_tests:
-        print("\n🎉 ALL TESTS PASSED!")
-        return True
+    buf.write(f"\n📈 SUMMARY:\n")
+    buf.write(f"Total tests: {total_tests}\n")
+    buf.write(f"Passed: {passed_tests}\n")
+    buf.write(f"Failed: {total_tests - passed_tests}\n")
+    buf.write(f"Success rate: {(passed_tests/total_tests*100):.1f}%\n")
+
+    all_passed = passed_tests == total_tests
+    if all_passed:
+        buf.write("\n🎉 ALL TESTS PASSED!\n")
     else:
-        print(f"\n⚠️ {total_tests - passed_tests} TEST(S) FAILED")
-        return False
+        buf.write(f"\n⚠️ {total_tests - passed_tests} TEST(S) FAILED\n")
+
+    sys.stdout.write(buf.getvalue())
+    return all_passed
 
 def main():
     """Main test runner"""
@@ -241,9 +250,16 @@ def main():
         print("\n❌ Dependency check failed. Please install required packages.")
         sys.exit(1)
     
-    # Run test suites
-    unit_results = run_unit_tests()
-    integration_results = run_integration_tests()
+    # Run the subprocess-backed suites concurrently — they are independent
+    # pytest sessions, so wall clock drops to the slower of the two. The
+    # security and performance checks run in-process (they print directly)
+    # and stay sequential to keep their output readable.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        unit_future = executor.submit(run_unit_tests)
+        integration_future = executor.submit(run_integration_tests)
+        unit_results = unit_future.result()
+        integration_results = integration_future.result()
+
     security_passed = run_security_tests()
     performance_passed = run_performance_tests()
     
@@ -2,8 +2,10 @@
 Mock LLM Service for testing when AWS Bedrock is not available.
 """
 
+import hashlib
 import time
 import random
+from collections import OrderedDict
 from typing import Dict, Optional
 
 class MockLLMService:
@@ -13,39 +15,96 @@ class MockLLMService:
         self.model_id = "mock-claude-3-sonnet"
         self.region = "us-east-1"
         self.total_requests = 0
-        self.total_response_time = 0.0
+        # Welford running mean: O(1) state, numerically stable over
+        # millions of requests, no division when stats are read
+        self.mean_response_time = 0.0
         self.error_count = 0
-    
+
+        # Injectable sleep so tests can zero out the simulated latency
+        self._sleep = time.sleep
+        self._delay_range = (0.5, 1.5)
+
+        # LRU of response text per (prompt, context) digest: repeated
+        # prompts skip the simulated latency, mirroring the real
+        # service's response cache
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_max = 512
+
     def generate_response(self, prompt: str, context: Optional[str] = None) -> Dict[str, any]:
         """Generate a mock response"""
         start_time = time.time()
         self.total_requests += 1
-        
-        # Simulate processing time
-        time.sleep(random.uniform(0.5, 1.5))
-        
-        mock_response = f"Mock response to: {prompt[:50]}... This is a demonstration response."
-        
+
+        key = hashlib.blake2b(
+            (prompt + (context or "")).encode(), digest_size=16
+        ).digest()
+
+        mock_response = self._cache.get(key)
+        if mock_response is not None:
+            self._cache.move_to_end(key)
+        else:
+            # Simulate processing time only for unseen prompts
+            self._sleep(random.uniform(*self._delay_range))
+            mock_response = f"Mock response to: {prompt[:50]}... This is a demonstration response."
+            self._cache[key] = mock_response
+            while len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+
         response_time = time.time() - start_time
-        self.total_response_time += response_time
-        
+        self.mean_response_time += (response_time - self.mean_response_time) / self.total_requests
+
         return {
             "success": True,
             "response": mock_response,
             "response_time": response_time,
             "model_id": self.model_id,
-            "token_count": len(mock_response.split())
+            # Space count is equivalent to len(split()) for the single-
+            # spaced mock text, without allocating the word list
+            "token_count": mock_response.count(' ') + 1
         }
+
+    def generate_batch(self, prompts, context: Optional[str] = None):
+        """Generate mock responses for a batch of prompts.
+
+        The simulated latency is paid once for the whole batch rather
+        than per prompt, mimicking a concurrently dispatched fan-out.
+        """
+        if not prompts:
+            return []
+
+        start_time = time.time()
+        self.total_requests += len(prompts)
+
+        # Simulate one processing window for the whole batch
+        self._sleep(random.uniform(*self._delay_range))
+
+        results = []
+        for prompt in prompts:
+            mock_response = f"Mock response to: {prompt[:50]}... This is a demonstration response."
+            results.append({
+                "success": True,
+                "response": mock_response,
+                "response_time": time.time() - start_time,
+                "model_id": self.model_id,
+                "token_count": mock_response.count(' ') + 1
+            })
+
+        # Fold the batch into the running mean as len(prompts)
+        # observations of the shared elapsed time
+        elapsed = time.time() - start_time
+        self.mean_response_time += (
+            (elapsed - self.mean_response_time) * len(prompts) / self.total_requests
+        )
+        return results
     
     def get_performance_stats(self) -> Dict[str, any]:
         """Get performance statistics"""
         if self.total_requests == 0:
             return {"total_requests": 0, "average_response_time": 0, "error_rate": 0, "success_rate": 100}
         
-        avg_response_time = self.total_response_time / self.total_requests
         return {
             "total_requests": self.total_requests,
-            "average_response_time": round(avg_response_time, 2),
+            "average_response_time": round(self.mean_response_time, 2),
             "error_rate": 0,
             "success_rate": 100
         }
@@ -14,8 +14,14 @@ import numpy as np
 from config import Config
 from utils.security import SecurityManager
 from services.llm_service import LLMService
+from services.mock_llm_service import mock_llm_service
 from utils.logger import RAGLogger
 
+@pytest.fixture(autouse=True)
+def no_mock_sleep(monkeypatch):
+    """Zero out the mock service's simulated latency for every test"""
+    monkeypatch.setattr(mock_llm_service, "_sleep", lambda *_: None)
+
 class TestConfig:
     """Test configuration management"""
     
@@ -129,10 +135,11 @@ class TestSecurityManager:
         assert allowed
         assert remaining == Config.RATE_LIMIT_PER_MINUTE - 1
         
-        # Simulate rate limit exceeded
-        for _ in range(Config.RATE_LIMIT_PER_MINUTE):
-            self.security_manager.check_rate_limit(client_id)
-        
+        # Empty the bucket directly instead of looping
+        # RATE_LIMIT_PER_MINUTE check_rate_limit calls
+        import time
+        self.security_manager.rate_limit_store[client_id] = (0.0, time.time())
+
         # Should be blocked now
         allowed, remaining = self.security_manager.check_rate_limit(client_id)
         assert not allowed
@@ -200,6 +207,20 @@ class TestLLMService:
         assert stats["error_rate"] == 0
         assert stats["success_rate"] == 0
     
+    def test_mock_generate_batch_single_delay(self):
+        """Test that a mock batch pays the simulated latency once"""
+        from services.mock_llm_service import MockLLMService
+
+        service = MockLLMService()
+        sleep_calls = []
+        service._sleep = lambda delay: sleep_calls.append(delay)
+
+        results = service.generate_batch([f"prompt {i}" for i in range(16)])
+
+        assert len(results) == 16
+        assert all(result["success"] for result in results)
+        assert len(sleep_calls) == 1
+
     def test_performance_stats_with_data(self):
         """Test performance stats with request data"""
         # Simulate some requests
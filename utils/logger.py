@@ -3,9 +3,12 @@ Logging configuration for the PSS RAG system.
 Provides centralized logging with proper formatting and log levels.
 """
 
+import atexit
+import functools
 import logging
 import os
-from datetime import datetime
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 from config import Config
 
@@ -44,17 +47,27 @@ class RAGLogger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+
+        # Route records through a queue so a log call on the request
+        # path is a non-blocking put; the listener thread owns the file
+        # and console handlers and does the actual writes
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(QueueHandler(log_queue))
+
+        self._listener = QueueListener(
+            log_queue, file_handler, console_handler,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
     
     def info(self, message: str, extra: Optional[dict] = None):
         """Log info message"""
         self.logger.info(message, extra=extra)
     
-    def error(self, message: str, exc_info: bool = True, extra: Optional[dict] = None):
-        """Log error message"""
+    def error(self, message: str, exc_info: bool = False, extra: Optional[dict] = None):
+        """Log error message; pass exc_info=True inside except blocks
+        to include the traceback"""
         self.logger.error(message, exc_info=exc_info, extra=extra)
     
     def warning(self, message: str, extra: Optional[dict] = None):
@@ -67,12 +80,13 @@ class RAGLogger:
     
     def log_api_call(self, endpoint: str, user_query: str, response_time: float, success: bool):
         """Log API call details for monitoring"""
+        # No timestamp key: the formatter's %(asctime)s already stamps
+        # every record
         log_data = {
             'endpoint': endpoint,
             'query_length': len(user_query),
             'response_time': response_time,
-            'success': success,
-            'timestamp': datetime.now().isoformat()
+            'success': success
         }
         
         if success:
@@ -84,8 +98,7 @@ class RAGLogger:
         """Log security-related events"""
         log_data = {
             'event_type': event_type,
-            'severity': severity,
-            'timestamp': datetime.now().isoformat()
+            'severity': severity
         }
         
         message = f"Security Event: {event_type} - {details}"
@@ -97,5 +110,10 @@ class RAGLogger:
         else:
             self.info(message, extra=log_data)
 
+@functools.cache
+def get_logger(name: str = "PSS_RAG") -> RAGLogger:
+    """Return the RAGLogger for name, constructing it once per process"""
+    return RAGLogger(name)
+
 # Global logger instance
-logger = RAGLogger() 
\ No newline at end of file
+logger = get_logger()
\ No newline at end of file
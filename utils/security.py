@@ -3,42 +3,87 @@ Security utilities for the PSS RAG system.
 Implements input validation, rate limiting, and privacy controls.
 """
 
+import functools
 import re
 import time
 import hashlib
 from typing import Dict, List, Tuple, Optional
-from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from config import Config
 from utils.logger import logger
 
 class SecurityManager:
     """Manages security aspects of the RAG system"""
-    
+
+    # The compiled patterns are class attributes: they carry no per-
+    # instance state, so even if the module is re-imported or several
+    # managers are constructed (tests, Streamlit reloader) they are
+    # compiled exactly once per process.
+
+    # Blocked patterns for input validation, fused into one compiled
+    # alternation so validate_input makes a single pass over the
+    # input instead of one scan per pattern
+    blocked_patterns = (
+        r'<script.*?>.*?</script>',  # XSS prevention
+        r'javascript:',  # JavaScript injection
+        r'data:text/html',  # Data URI attacks
+        r'vbscript:',  # VBScript injection
+        r'\bUNION\b.*\bSELECT\b',  # SQL injection attempts
+        r'\bDROP\b.*\bTABLE\b',  # SQL injection attempts
+        r'eval\s*\(',  # Code injection
+        r'exec\s*\(',  # Code execution
+    )
+    _blocked_union = re.compile(
+        "|".join(f"(?:{pattern})" for pattern in blocked_patterns),
+        re.IGNORECASE
+    )
+
+    # Sensitive data patterns, fused into one alternation so a
+    # redaction is a single pass and one output allocation instead
+    # of one re.sub (and intermediate string) per pattern. ASCII
+    # keeps \b/\d byte-level: these only ever match ASCII text
+    _redact_replacements = {
+        'ssn': '[SSN_REDACTED]',
+        'card': '[CARD_REDACTED]',
+        'email': '[EMAIL_REDACTED]',
+        'phone': '[PHONE_REDACTED]',
+    }
+    _redact_union = re.compile(
+        r'(?P<ssn>\b\d{3}-\d{2}-\d{4}\b)'
+        r'|(?P<card>\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b)'
+        r'|(?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+        r'|(?P<phone>\b\d{3}[-.]?\d{3}[-.]?\d{4}\b)',
+        re.ASCII
+    )
+
+    # Prohibited content categories, likewise fused into one scan;
+    # the matching named group tells us which category fired
+    _prohibited_categories = {
+        "security": "Security-related content",
+        "illegal": "Illegal activity content",
+        "harmful": "Harmful content",
+    }
+    _prohibited_union = re.compile(
+        r'\b(?:(?P<security>hack|exploit|vulnerability)'
+        r'|(?P<illegal>illegal|criminal|fraud)'
+        r'|(?P<harmful>violence|harmful|dangerous))\b',
+        re.IGNORECASE
+    )
+
+    # sanitize_input helper
+    _html_tag_pattern = re.compile(r'<[^>]+>')
+
     def __init__(self):
-        # Rate limiting storage
-        self.rate_limit_store: Dict[str, deque] = defaultdict(deque)
-        
-        # Blocked patterns for input validation
-        self.blocked_patterns = [
-            r'<script.*?>.*?</script>',  # XSS prevention
-            r'javascript:',  # JavaScript injection
-            r'data:text/html',  # Data URI attacks
-            r'vbscript:',  # VBScript injection
-            r'\bUNION\b.*\bSELECT\b',  # SQL injection attempts
-            r'\bDROP\b.*\bTABLE\b',  # SQL injection attempts
-            r'eval\s*\(',  # Code injection
-            r'exec\s*\(',  # Code execution
-        ]
-        
-        # Sensitive data patterns to redact
-        self.sensitive_patterns = [
-            (r'\b\d{3}-\d{2}-\d{4}\b', '[SSN_REDACTED]'),  # SSN
-            (r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', '[CARD_REDACTED]'),  # Credit card
-            (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL_REDACTED]'),  # Email
-            (r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', '[PHONE_REDACTED]'),  # Phone number
-        ]
-    
+        # Token buckets for rate limiting: client_id -> (tokens, last_refill).
+        # O(1) time and memory per client, vs. the previous per-request
+        # timestamp deque that was evicted entry by entry on every call.
+        # Bounded: once the store tracks more clients than the cap, idle
+        # buckets are swept so memory stays O(active clients) on a
+        # long-running server
+        self.rate_limit_store: Dict[str, Tuple[float, float]] = {}
+        self._max_tracked_clients = 10000
+
+
     def get_client_ip(self) -> str:
         """Get client IP address for rate limiting"""
         # Import streamlit here to avoid early usage
@@ -46,95 +91,128 @@ class SecurityManager:
         
         # In Streamlit, we use session state as identifier
         if 'client_id' not in st.session_state:
-            st.session_state.client_id = hashlib.md5(
-                str(time.time()).encode()
-            ).hexdigest()[:16]
+            st.session_state.client_id = hashlib.blake2b(
+                str(time.time()).encode(), digest_size=8
+            ).hexdigest()
         return st.session_state.client_id
     
     def check_rate_limit(self, client_id: str) -> Tuple[bool, int]:
         """
         Check if client has exceeded rate limit.
         Returns (allowed, remaining_requests)
+
+        Token bucket: each client holds up to RATE_LIMIT_PER_MINUTE
+        tokens, refilled continuously at that rate per minute. A request
+        costs one token; an empty bucket means the limit is hit.
         """
         now = time.time()
-        minute_ago = now - 60
-        
-        # Clean old entries
-        while (self.rate_limit_store[client_id] and 
-               self.rate_limit_store[client_id][0] < minute_ago):
-            self.rate_limit_store[client_id].popleft()
-        
-        current_requests = len(self.rate_limit_store[client_id])
-        
-        if current_requests >= Config.RATE_LIMIT_PER_MINUTE:
+        capacity = float(Config.RATE_LIMIT_PER_MINUTE)
+
+        tokens, last_refill = self.rate_limit_store.get(client_id, (capacity, now))
+        tokens = min(capacity, tokens + (now - last_refill) * capacity / 60.0)
+
+        if tokens < 1.0:
+            self.rate_limit_store[client_id] = (tokens, now)
             logger.log_security_event(
-                "RATE_LIMIT_EXCEEDED", 
-                f"Client {client_id} exceeded rate limit", 
+                "RATE_LIMIT_EXCEEDED",
+                f"Client {client_id} exceeded rate limit",
                 "WARNING"
             )
             return False, 0
-        
-        # Add current request
-        self.rate_limit_store[client_id].append(now)
-        remaining = Config.RATE_LIMIT_PER_MINUTE - current_requests - 1
-        
-        return True, remaining
+
+        tokens -= 1.0
+        self.rate_limit_store[client_id] = (tokens, now)
+
+        if len(self.rate_limit_store) > self._max_tracked_clients:
+            self._evict_idle_buckets(now)
+
+        return True, int(tokens)
+
+    def _evict_idle_buckets(self, now: float):
+        """Drop buckets idle for a full window.
+
+        After 60 idle seconds a bucket has refilled to capacity, so
+        forgetting it is indistinguishable from keeping it around.
+        """
+        stale = [
+            client_id
+            for client_id, (_, last_refill) in self.rate_limit_store.items()
+            if now - last_refill >= 60.0
+        ]
+        for client_id in stale:
+            del self.rate_limit_store[client_id]
+
+    def peek_rate_limit(self, client_id: str) -> Tuple[bool, int]:
+        """
+        Inspect a client's rate limit without consuming a token.
+        Returns (allowed, remaining_requests)
+        """
+        now = time.time()
+        capacity = float(Config.RATE_LIMIT_PER_MINUTE)
+
+        tokens, last_refill = self.rate_limit_store.get(client_id, (capacity, now))
+        tokens = min(capacity, tokens + (now - last_refill) * capacity / 60.0)
+
+        return tokens >= 1.0, int(tokens)
     
     def validate_input(self, user_input: str) -> Tuple[bool, str]:
         """
         Validate user input for security threats.
         Returns (is_valid, cleaned_input)
         """
-        if not user_input or not user_input.strip():
+        if not user_input:
             return False, "Empty input not allowed"
-        
-        # Check length
+
+        # Check length before strip(): rejecting an oversized input is
+        # O(1) this way instead of copying it first
         if len(user_input) > Config.MAX_QUERY_LENGTH:
             logger.log_security_event(
-                "INPUT_TOO_LONG", 
-                f"Input length: {len(user_input)}", 
+                "INPUT_TOO_LONG",
+                f"Input length: {len(user_input)}",
                 "WARNING"
             )
             return False, f"Input too long. Maximum {Config.MAX_QUERY_LENGTH} characters allowed."
+
+        if not user_input.strip():
+            return False, "Empty input not allowed"
         
-        # Check for malicious patterns
-        user_input_lower = user_input.lower()
-        for pattern in self.blocked_patterns:
-            if re.search(pattern, user_input_lower, re.IGNORECASE):
-                logger.log_security_event(
-                    "MALICIOUS_INPUT_DETECTED", 
-                    f"Pattern matched: {pattern}", 
-                    "CRITICAL"
-                )
-                return False, "Input contains potentially malicious content"
-        
+        # Check for malicious patterns (single fused scan)
+        match = self._blocked_union.search(user_input)
+        if match:
+            logger.log_security_event(
+                "MALICIOUS_INPUT_DETECTED",
+                f"Matched: {match.group(0)[:40]}",
+                "CRITICAL"
+            )
+            return False, "Input contains potentially malicious content"
+
         # Clean and return
         cleaned_input = self.sanitize_input(user_input)
         return True, cleaned_input
+
+    def validate_batch(self, inputs: List[str]) -> List[Tuple[bool, str]]:
+        """Validate many inputs, reusing the compiled patterns across all of them"""
+        return [self.validate_input(user_input) for user_input in inputs]
     
     def sanitize_input(self, user_input: str) -> str:
         """Sanitize user input"""
-        # Remove any HTML tags
-        cleaned = re.sub(r'<[^>]+>', '', user_input)
-        
-        # Remove excessive whitespace
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-        
-        return cleaned
-    
+        # Strip HTML tags, then collapse whitespace in one C-level pass:
+        # split() handles all whitespace runs (and the ends) that the
+        # old \s+ substitution plus strip() needed two passes for
+        return ' '.join(self._html_tag_pattern.sub('', user_input).split())
+
     def redact_sensitive_data(self, text: str) -> str:
         """Redact sensitive information from text"""
-        redacted_text = text
-        
-        for pattern, replacement in self.sensitive_patterns:
-            redacted_text = re.sub(pattern, replacement, redacted_text)
-        
-        return redacted_text
+        return self._redact_union.sub(
+            lambda match: self._redact_replacements[match.lastgroup], text
+        )
     
     def log_user_interaction(self, query: str, response_preview: str):
         """Log user interactions for audit purposes (with privacy protection)"""
-        # Hash the query for privacy
-        query_hash = hashlib.sha256(query.encode()).hexdigest()[:16]
+        # Hash the query for privacy; an 8-byte blake2b digest gives the
+        # same 16 hex chars without computing (then discarding) a full
+        # SHA-256
+        query_hash = hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
         
         # Create safe preview (first 100 chars, redacted)
         safe_preview = self.redact_sensitive_data(response_preview[:100])
@@ -146,25 +224,16 @@ class SecurityManager:
     
     def check_content_policy(self, text: str) -> Tuple[bool, str]:
         """Check if content violates usage policies"""
-        
-        # Define prohibited content categories
-        prohibited_patterns = [
-            (r'\b(hack|exploit|vulnerability)\b', "Security-related content"),
-            (r'\b(illegal|criminal|fraud)\b', "Illegal activity content"),
-            (r'\b(violence|harmful|dangerous)\b', "Harmful content"),
-        ]
-        
-        text_lower = text.lower()
-        
-        for pattern, category in prohibited_patterns:
-            if re.search(pattern, text_lower):
-                logger.log_security_event(
-                    "CONTENT_POLICY_VIOLATION",
-                    f"Category: {category}",
-                    "WARNING"
-                )
-                return False, f"Content violates policy: {category}"
-        
+        match = self._prohibited_union.search(text)
+        if match:
+            category = self._prohibited_categories[match.lastgroup]
+            logger.log_security_event(
+                "CONTENT_POLICY_VIOLATION",
+                f"Category: {category}",
+                "WARNING"
+            )
+            return False, f"Content violates policy: {category}"
+
         return True, "Content approved"
     
     def get_session_info(self) -> Dict:
@@ -173,14 +242,20 @@ class SecurityManager:
         import streamlit as st
         
         client_id = self.get_client_ip()
-        allowed, remaining = self.check_rate_limit(client_id)
-        
+        # Peek so that rendering session info doesn't burn a token
+        allowed, remaining = self.peek_rate_limit(client_id)
+
         return {
             "client_id": client_id,
             "rate_limit_remaining": remaining,
             "session_start": st.session_state.get('session_start', datetime.now()),
-            "requests_made": len(self.rate_limit_store[client_id])
+            "requests_made": Config.RATE_LIMIT_PER_MINUTE - remaining
         }
 
+@functools.cache
+def get_security_manager() -> SecurityManager:
+    """Return the process-wide SecurityManager, constructing it once"""
+    return SecurityManager()
+
 # Global security manager instance
-security_manager = SecurityManager() 
\ No newline at end of file
+security_manager = get_security_manager()
\ No newline at end of file